@@ -2,14 +2,23 @@
 This script contains data classes and API clients for code reusing
 """
 
+import atexit
 import base64
+import json
 import logging
 import os
+import random
+import re
+import shelve
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from urllib.parse import urlencode
 
 import psycopg2
 import psycopg2.pool
+from psycopg2 import sql
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -17,9 +26,6 @@ import yaml
 import warnings
 
 
-# Global session with connection pooling
-session = requests.Session()
-
 # Retry strategy for transient failures
 retry_strategy = Retry(
     total=3,
@@ -27,9 +33,91 @@ retry_strategy = Retry(
     status_forcelist=[429, 500, 502, 503, 504],
     allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"]
 )
-adapter = HTTPAdapter(max_retries=retry_strategy)
-session.mount("http://", adapter)
-session.mount("https://", adapter)
+
+# Keep-alive connections per host; sized for the repo and import worker threads sharing the session
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+
+
+def _build_session(retry):
+    """Session with connection pooling and the given retry strategy, closed at exit"""
+    pooled_session = requests.Session()
+    pooled_adapter = HTTPAdapter(max_retries=retry, pool_maxsize=HTTP_POOL_MAXSIZE)
+    pooled_session.mount("http://", pooled_adapter)
+    pooled_session.mount("https://", pooled_adapter)
+    atexit.register(pooled_session.close)
+    return pooled_session
+
+
+# Global session with connection pooling
+session = _build_session(retry_strategy)
+# Jira creates are not idempotent: a POST whose response was lost (e.g. a 504 after Jira committed)
+# must not be resent, or a whole bulk batch is duplicated. Connection errors are still retried.
+write_session = _build_session(retry_strategy.new(allowed_methods=Retry.DEFAULT_ALLOWED_METHODS))
+# GitHub rate limits (403/429) are left to GitHubClient._request, which honours Retry-After,
+# rotates tokens and backs off. urllib3 would otherwise retry 429s (and any Retry-After response)
+# itself and raise RetryError once exhausted, so _request never saw them.
+github_session = _build_session(
+    retry_strategy.new(status_forcelist=[500, 502, 503, 504], respect_retry_after_header=False)
+)
+
+# Issue number in the "Imported from [GitHub Issue #N](url)" link the importers append to descriptions
+_IMPORTED_LINK_RE = re.compile(r"\[GitHub Issue #(\d+)\]")
+# Standalone numbers in a Jira summary, so "ecs2" or "v2.1" never count as issue 2
+_SUMMARY_NUMBER_RE = re.compile(r"(?<![\w.])#?(\d+)(?![\w.])")
+
+# Issue fields the importers use, with labels and the first page of comments
+_ISSUE_FIELDS_FRAGMENT = """
+fragment IssueFields on Issue {
+  number title body url
+  labels(first: 100) { nodes { name } }
+  comments(first: 100) { totalCount nodes { author { login } createdAt body } }
+}
+"""
+
+# Open issues of a repository
+_ISSUES_WITH_COMMENTS_QUERY = _ISSUE_FIELDS_FRAGMENT + """
+query($org: String!, $repo: String!, $cursor: String) {
+  repository(owner: $org, name: $repo) {
+    issues(first: 100, after: $cursor, states: OPEN) {
+      pageInfo { endCursor hasNextPage }
+      nodes { ...IssueFields }
+    }
+  }
+}
+"""
+
+# Issues matching a search query; the repository lookup reports a missing repository as NOT_FOUND
+_SEARCH_ISSUES_WITH_COMMENTS_QUERY = _ISSUE_FIELDS_FRAGMENT + """
+query($org: String!, $repo: String!, $search: String!, $cursor: String) {
+  repository(owner: $org, name: $repo) { id }
+  search(query: $search, type: ISSUE, first: 100, after: $cursor) {
+    issueCount
+    pageInfo { endCursor hasNextPage }
+    nodes { ...IssueFields }
+  }
+}
+"""
+
+
+class RequestThrottle:
+    """Thread-safe token bucket: bursts of up to `burst` requests, then `rate` requests per second"""
+
+    def __init__(self, rate=5.0, burst=10):
+        self.interval = 1.0 / rate
+        # How far ahead of the steady rate a burst may run
+        self.tolerance = (burst - 1) * self.interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Block until a token is available"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - self.tolerance - now
+        if delay > 0:
+            time.sleep(delay)
 
 
 class EnvVariables:
@@ -52,7 +140,11 @@ class EnvVariables:
         self.github_orgs = [org.strip() for org in github_orgs_str.split(',')]
         self.github_token = os.getenv("GITHUB_TOKEN")
         self.github_fallback_token = os.getenv("GITHUB_FALLBACK_TOKEN")
+        # Optional extra tokens (comma separated) to spread requests over more rate limit budget
+        self.github_extra_tokens = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()]
         self.github_api_url = os.getenv("GITHUB_API_URL")
+        # GitHub asks integrators to keep concurrent requests well below 100
+        self.github_max_concurrency = int(os.getenv("GITHUB_MAX_CONCURRENCY", "16"))
 
         # Jira - certificate auth
         self.jira_api_token = os.getenv("JIRA_TOKEN")
@@ -65,6 +157,18 @@ class EnvVariables:
         gitea_path = "/repos/infra/otc-metadata-rework/contents/otc_metadata/data/cloud_environments/"
         self.gitea_url_envs = f"{base_gitea}{gitea_path}"
         self.gitea_token = os.getenv("GITEA_TOKEN")
+        # Affected locations per org change rarely; keep them on disk between runs
+        cache_home = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        self.gitea_locations_cache_path = os.path.join(cache_home, "giji", "gitea_locations.json")
+        self.gitea_locations_ttl = int(os.getenv("GITEA_LOCATIONS_TTL", "86400"))
+        self.refresh_cache = os.getenv("GIJI_REFRESH_CACHE") == "1"
+
+        # Optional on-disk record of imported issues, kept between runs
+        self.import_cache_path = os.getenv("IMPORT_CACHE_PATH")
+        # Optional Postgres table (in DB_CSV) recording imported issues, shared by every runner
+        self.import_cache_table = os.getenv("IMPORT_CACHE_TABLE")
+        # Optional on-disk store of GitHub ETags and response bodies for conditional requests
+        self.github_etag_cache_path = os.getenv("GITHUB_ETAG_CACHE_PATH")
 
         self.check_env_variables()
 
@@ -82,12 +186,15 @@ class Database:
         self.db_password = env.db_password
         self.logger = logging.getLogger(__name__)
         self._pool = None
+        self._pool_lock = threading.Lock()
 
-    def get_pool(self, db_name, minconn=1, maxconn=10):
-        """Get or create connection pool for database"""
-        if self._pool is None:
+    def get_pool(self, db_name, minconn=1, maxconn=8):
+        """Get or create thread-safe connection pool for database"""
+        with self._pool_lock:
+            if self._pool is not None:
+                return self._pool
             try:
-                self._pool = psycopg2.pool.SimpleConnectionPool(
+                self._pool = psycopg2.pool.ThreadedConnectionPool(
                     minconn,
                     maxconn,
                     host=self.db_host,
@@ -100,7 +207,7 @@ class Database:
             except psycopg2.Error as e:
                 self.logger.error("Failed to create connection pool: %s", str(e))
                 raise
-        return self._pool
+            return self._pool
 
     @contextmanager
     def get_connection(self, db_name):
@@ -118,6 +225,24 @@ class Database:
             if conn:
                 pool.putconn(conn)
 
+    def get_repositories_by_squads(self, db_name, squads):
+        """Repositories owned by the given squads, sorted and without duplicates"""
+        query = """
+            SELECT DISTINCT "Repository"
+            FROM repo_title_category
+            WHERE "Squad" = ANY(%s)
+            ORDER BY "Repository"
+        """
+
+        with self.get_connection(db_name) as conn:
+            with conn.cursor() as cur:
+                # An array parameter keeps one query text for any number of squads, even none
+                cur.execute(query, (list(squads),))
+                repositories = tuple(repository for (repository,) in cur)
+
+        self.logger.info("Squads %r: %d repositories", squads, len(repositories))
+        return repositories
+
     def connect_to_db(self, db_name):
         """Legacy method for backwards compatibility - returns connection from pool"""
         warnings.warn(
@@ -131,61 +256,272 @@ class Database:
 
     def close_pool(self):
         """Close all connections in pool"""
-        if self._pool:
-            self._pool.closeall()
-            self.logger.info("Connection pool closed")
+        with self._pool_lock:
+            if self._pool:
+                self._pool.closeall()
+                self._pool = None
+                self.logger.info("Connection pool closed")
+
+
+class ImportCache:
+    """Record of GitHub issues already imported to Jira.
+
+    Persisted with shelve when a path is set, and mirrored to a Postgres table when a table is set,
+    so that re-runs skip imported issues without any API call.
+    """
+
+    def __init__(self, path=None, database=None, db_name=None, table=None):
+        self.path = path
+        self.database = database
+        self.db_name = db_name
+        self.table = table if database is not None else None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._store = {}
+        if path:
+            self._store = shelve.open(path)
+            self.logger.info("Import cache opened: %s (%d entries)", path, len(self._store))
+        if self.table:
+            self._load_table()
+
+    @staticmethod
+    def _key(org, repo_name, issue_number):
+        return f"{org}/{repo_name}#{issue_number}"
+
+    def _load_table(self):
+        """Create the imported issues table if needed and load its rows into the cache"""
+        create = sql.SQL("""
+            CREATE TABLE IF NOT EXISTS {} (
+                org TEXT NOT NULL,
+                repo TEXT NOT NULL,
+                number INTEGER NOT NULL,
+                jira_key TEXT NOT NULL,
+                PRIMARY KEY (org, repo, number)
+            )
+        """).format(sql.Identifier(self.table))
+        select = sql.SQL("SELECT org, repo, number, jira_key FROM {}").format(sql.Identifier(self.table))
+
+        try:
+            with self.database.get_connection(self.db_name) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(create)
+                    cur.execute(select)
+                    rows = cur.fetchall()
+                conn.commit()
+        except psycopg2.Error as e:
+            self.logger.error("Failed to load import cache table %s: %s", self.table, e)
+            self.table = None
+            return
+
+        for org, repo_name, issue_number, jira_key in rows:
+            self._store[self._key(org, repo_name, issue_number)] = jira_key
+        self.logger.info("Import cache table loaded: %s (%d rows)", self.table, len(rows))
+
+    def contains(self, org, repo_name, issue_number):
+        with self._lock:
+            return self._key(org, repo_name, issue_number) in self._store
+
+    def add(self, org, repo_name, issue_number, jira_key):
+        with self._lock:
+            self._store[self._key(org, repo_name, issue_number)] = jira_key
+
+            if not self.table:
+                return
+
+            # Inserts run one at a time under the lock, so concurrent importers hold at most one
+            # pool connection here and never exhaust the pool (getconn raises instead of waiting)
+            insert = sql.SQL(
+                "INSERT INTO {} (org, repo, number, jira_key) VALUES (%s, %s, %s, %s) ON CONFLICT DO NOTHING"
+            ).format(sql.Identifier(self.table))
+            try:
+                with self.database.get_connection(self.db_name) as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(insert, (org, repo_name, issue_number, jira_key))
+                    conn.commit()
+            except psycopg2.Error as e:
+                self.logger.warning("Failed to record %s in %s: %s",
+                                    self._key(org, repo_name, issue_number), self.table, e)
+
+    def close(self):
+        """Flush and close the underlying shelf"""
+        if self.path:
+            with self._lock:
+                self._store.close()
+
+
+class EtagCache:
+    """ETag and JSON body per request URL, persisted with shelve when a path is set"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._store = None
+
+    def _open(self):
+        # Opened lazily so that constructing a client does not touch the disk
+        if self._store is None:
+            self._store = shelve.open(self.path) if self.path else {}
+        return self._store
+
+    def get(self, url):
+        """Return the cached (etag, body) pair for url, or None"""
+        with self._lock:
+            return self._open().get(url)
+
+    def set(self, url, etag, body):
+        with self._lock:
+            self._open()[url] = (etag, body)
+
+    def close(self):
+        with self._lock:
+            if self.path and self._store is not None:
+                self._store.close()
+            self._store = None
 
 
 class GitHubClient:
-    def __init__(self, env, timeout=30):
+    # Upper bound in seconds for backing off from secondary rate limits
+    MAX_BACKOFF = 60
+
+    def __init__(self, env, timeout=30, http_session=None):
         self.api_url = env.github_api_url
+        # GitHub Enterprise serves GraphQL at /api/graphql next to the /api/v3 REST root
+        self.graphql_url = re.sub(r"/v3/?$", "", (self.api_url or "").rstrip("/")) + "/graphql"
         self.token = env.github_token
+        # Requests rotate over every configured token; each token has its own rate limit budget
+        self.tokens = list(dict.fromkeys(
+            token for token in [env.github_token, *env.github_extra_tokens, env.github_fallback_token] if token
+        ))
         self.timeout = timeout
+        # Shared keep-alive session unless the caller supplies its own
+        self.session = http_session or github_session
         self.headers = {
             "Authorization": f"token {self.token}",
             "Accept": "application/vnd.github.v3+json"
         }
         self.logger = logging.getLogger(__name__)
-        self.rate_limit_remaining = None
-        self.rate_limit_reset = None
-
-    def _check_rate_limit(self):
-        """Check GitHub rate limit before making requests"""
-        if self.rate_limit_remaining is not None and self.rate_limit_remaining < 10:
-            reset_time = self.rate_limit_reset or time.time()
-            wait_time = max(0, reset_time - time.time())
-            if wait_time > 0:
-                self.logger.warning("Rate limit low (%d remaining). Waiting %d seconds...",
-                                    self.rate_limit_remaining, int(wait_time))
-                time.sleep(wait_time + 1)
-
-    def _update_rate_limit(self, response):
-        """Update rate limit info from response headers"""
+        self._token_lock = threading.Lock()
+        self._token_index = 0
+        # token -> (remaining, reset epoch) from the latest response made with it
+        self._token_limits = {}
+        # Spaces out writes so concurrent workers stay under GitHub's secondary rate limits
+        self.write_throttle = RequestThrottle()
+        # Caps requests in flight across all worker threads sharing this client
+        self._in_flight = threading.BoundedSemaphore(max(1, env.github_max_concurrency))
+        self.etag_cache = EtagCache(env.github_etag_cache_path)
+
+    def _next_token(self):
+        """Pick the next token with rate limit budget left, waiting for a reset if all are low"""
+        while True:
+            with self._token_lock:
+                now = time.time()
+                for offset in range(len(self.tokens)):
+                    index = (self._token_index + offset) % len(self.tokens)
+                    token = self.tokens[index]
+                    remaining, reset = self._token_limits.get(token, (None, None))
+                    if remaining is None or remaining >= 10 or reset <= now:
+                        self._token_index = index + 1
+                        return token
+
+                wait_time = min(reset for _, reset in self._token_limits.values()) - now
+
+            self.logger.warning("Rate limit low on all %d tokens. Waiting %d seconds...",
+                                len(self.tokens), int(wait_time))
+            time.sleep(wait_time + 1)
+
+    def _update_rate_limit(self, token, response):
+        """Update rate limit info of a token from response headers"""
         try:
-            self.rate_limit_remaining = int(response.headers.get('X-RateLimit-Remaining', 5000))
-            self.rate_limit_reset = int(response.headers.get('X-RateLimit-Reset', time.time() + 3600))
+            remaining = int(response.headers.get('X-RateLimit-Remaining', 5000))
+            reset = int(response.headers.get('X-RateLimit-Reset', time.time() + 3600))
         except (ValueError, TypeError):
-            pass
+            return
+        with self._token_lock:
+            self._token_limits[token] = (remaining, reset)
+
+    def _retry_delay(self, response, attempt=0):
+        """Seconds to wait before retrying a rate limited response, None if it was not rate limited"""
+        if response.status_code not in (403, 429):
+            return None
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return max(0, int(retry_after))
+            except ValueError:
+                return None
+
+        # Primary rate limit exhausted: retry at once, _next_token moves on or waits for the reset
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            return 0
+
+        # Secondary rate limit without Retry-After: exponential backoff with full jitter
+        if response.status_code == 429 or "secondary rate limit" in response.text.lower():
+            return random.uniform(1, min(self.MAX_BACKOFF, 2 ** (attempt + 1)))
+        return None
+
+    def _request(self, method, url, headers=None, max_retries=3, **kwargs):
+        """Send a GitHub request, sleeping only when GitHub reports a rate limit"""
+        for attempt in range(max_retries + 1):
+            token = self._next_token()
+            with self._in_flight:
+                response = self.session.request(
+                    method, url, headers={**(headers or self.headers), "Authorization": f"token {token}"},
+                    timeout=self.timeout, **kwargs
+                )
+            self._update_rate_limit(token, response)
+
+            delay = self._retry_delay(response, attempt)
+            if delay is None or attempt == max_retries:
+                return response
+
+            self.logger.warning("Rate limited by GitHub (%s %s). Retrying in %d seconds...",
+                                method, url, int(delay))
+            time.sleep(delay)
+
+        return response
+
+    def _get_json(self, url, params=None):
+        """GET a JSON resource, revalidating a cached body with If-None-Match.
+
+        Returns (response, body); body is None unless the status is 200 or 304.
+        """
+        cache_key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        cached = self.etag_cache.get(cache_key)
+        headers = self.headers
+        if cached:
+            headers = {**self.headers, "If-None-Match": cached[0]}
+
+        response = self._request("GET", url, headers=headers, params=params)
+
+        # 304 responses are not counted against the primary rate limit
+        if response.status_code == 304 and cached:
+            return response, cached[1]
+        if response.status_code != 200:
+            return response, None
+
+        body = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            self.etag_cache.set(cache_key, etag, body)
+        return response, body
+
+    def close(self):
+        """Release resources held by the client"""
+        self.etag_cache.close()
 
     def get_issues(self, org, repo_name, state="open"):
         """Fetch issues from GitHub repository."""
-        self._check_rate_limit()
-
-        response = session.get(
+        response, issues = self._get_json(
             f"{self.api_url}/repos/{org}/{repo_name}/issues",
-            params={"state": state},
-            headers=self.headers,
-            timeout=self.timeout
+            params={"state": state}
         )
 
-        self._update_rate_limit(response)
-
-        if response.status_code != 200:
+        if issues is None:
             raise requests.RequestException(
                 f"GitHub API request failed for {repo_name}: {response.status_code} {response.text}"
             )
 
-        issues = response.json()
         return issues
 
     def get_all_issues_paginated(self, org, repo_name, state="open", per_page=100):
@@ -194,23 +530,16 @@ class GitHubClient:
         page = 1
 
         while True:
-            self._check_rate_limit()
-
-            response = session.get(
+            response, issues = self._get_json(
                 f"{self.api_url}/repos/{org}/{repo_name}/issues",
-                params={"state": state, "per_page": per_page, "page": page},
-                headers=self.headers,
-                timeout=self.timeout
+                params={"state": state, "per_page": per_page, "page": page}
             )
 
-            self._update_rate_limit(response)
-
-            if response.status_code != 200:
+            if issues is None:
                 raise requests.RequestException(
                     f"GitHub API request failed for {repo_name}: {response.status_code} {response.text}"
                 )
 
-            issues = response.json()
             if not issues:
                 break
 
@@ -224,33 +553,144 @@ class GitHubClient:
 
     def get_issue_comments(self, org, repo_name, issue_number):
         """Fetch comments from GitHub issue."""
-        self._check_rate_limit()
-
         url = f"{self.api_url}/repos/{org}/{repo_name}/issues/{issue_number}/comments"
 
         try:
-            response = session.get(url, headers=self.headers, timeout=self.timeout)
-            self._update_rate_limit(response)
-
-            if response.status_code == 200:
-                return response.json()
-            return []
+            _, comments = self._get_json(url)
+            return comments or []
         except Exception:
             return []
 
+    @staticmethod
+    def _rest_comments(comments):
+        """REST shaped comments of a GraphQL comment connection, None if it holds only the first page"""
+        if comments["totalCount"] > len(comments["nodes"]):
+            return None
+        return [
+            {
+                "user": {"login": (comment["author"] or {}).get("login", "ghost")},
+                "created_at": comment["createdAt"],
+                "body": comment["body"]
+            }
+            for comment in comments["nodes"]
+        ]
+
+    def get_comments_bulk(self, org, repo_name, issue_numbers, batch_size=50):
+        """Fetch comments of several issues with one aliased GraphQL query per batch.
+
+        Returns {issue_number: comments}; issues that could not be fetched in full are left out.
+        """
+        numbers = [int(number) for number in issue_numbers]
+        comments_by_number = {}
+
+        for batch_start in range(0, len(numbers), batch_size):
+            batch = numbers[batch_start:batch_start + batch_size]
+            aliases = " ".join(
+                f"i{number}: issue(number: {number}) "
+                "{ comments(first: 100) { totalCount nodes { author { login } createdAt body } } }"
+                for number in batch
+            )
+            query = f"query($org: String!, $repo: String!) {{ repository(owner: $org, name: $repo) {{ {aliases} }} }}"
+
+            response = self._request(
+                "POST",
+                self.graphql_url,
+                json={"query": query, "variables": {"org": org, "repo": repo_name}}
+            )
+
+            repository = None
+            if response.status_code == 200:
+                repository = (response.json().get("data") or {}).get("repository")
+            if repository is None:
+                self.logger.warning("Failed to fetch comments in %s/%s: %s",
+                                    org, repo_name, response.status_code)
+                continue
+
+            for number in batch:
+                issue = repository.get(f"i{number}")
+                comments = self._rest_comments(issue["comments"]) if issue else None
+                if comments is not None:
+                    comments_by_number[number] = comments
+
+        return comments_by_number
+
+    def fetch_issues_with_comments_graphql(self, org, repo_name, search_filter=None):
+        """Fetch open issues and their comments with paginated GraphQL queries.
+
+        search_filter (e.g. "no:label") narrows the issues on the server through the search API,
+        which returns at most 1000 results.
+        Returns (issues, comments_by_number). Issues carry the REST fields the importers use;
+        comments are REST shaped, or None for an issue with more than one page of comments.
+        """
+        issues = []
+        comments_by_number = {}
+        cursor = None
+
+        query = _ISSUES_WITH_COMMENTS_QUERY
+        variables = {"org": org, "repo": repo_name}
+        if search_filter:
+            query = _SEARCH_ISSUES_WITH_COMMENTS_QUERY
+            variables["search"] = f"repo:{org}/{repo_name} is:issue is:open {search_filter}"
+
+        while True:
+            response = self._request(
+                "POST",
+                self.graphql_url,
+                json={"query": query, "variables": {**variables, "cursor": cursor}}
+            )
+
+            if response.status_code != 200:
+                raise requests.RequestException(
+                    f"GitHub GraphQL request failed for {repo_name}: {response.status_code} {response.text}"
+                )
+
+            payload = response.json()
+            data = payload.get("data") or {}
+            repository = data.get("repository")
+            connection = data.get("search") if search_filter else (repository or {}).get("issues")
+            if repository is None or connection is None:
+                errors = payload.get("errors") or []
+                status = 404 if any(error.get("type") == "NOT_FOUND" for error in errors) else response.status_code
+                raise requests.RequestException(
+                    f"GitHub GraphQL request failed for {repo_name}: {status} {errors}"
+                )
+
+            if search_filter and cursor is None and connection.get("issueCount", 0) > 1000:
+                self.logger.warning(
+                    "Search for %s/%s matches %d issues; only the first 1000 are returned",
+                    org, repo_name, connection["issueCount"])
+
+            for node in connection["nodes"]:
+                if not node:
+                    continue
+
+                number = node["number"]
+                issues.append({
+                    "number": number,
+                    "title": node["title"],
+                    "body": node["body"],
+                    "html_url": node["url"],
+                    "labels": [{"name": label["name"]} for label in node["labels"]["nodes"]]
+                })
+
+                comments_by_number[number] = self._rest_comments(node["comments"])
+
+            if not connection["pageInfo"]["hasNextPage"]:
+                break
+            cursor = connection["pageInfo"]["endCursor"]
+
+        return issues, comments_by_number
+
     def add_label_to_issue(self, org, repo_name, issue_number, labels):
         """Add labels to GitHub issue."""
-        self._check_rate_limit()
+        self.write_throttle.wait()
 
-        response = session.post(
+        response = self._request(
+            "POST",
             f"{self.api_url}/repos/{org}/{repo_name}/issues/{issue_number}/labels",
-            headers=self.headers,
-            json={"labels": labels},
-            timeout=self.timeout
+            json={"labels": labels}
         )
 
-        self._update_rate_limit(response)
-
         if response.status_code != 200:
             self.logger.warning(
                 "Failed to add labels to issue #%s in %s: %s",
@@ -261,17 +701,14 @@ class GitHubClient:
 
     def add_comment_to_issue(self, org, repo_name, issue_number, comment_body):
         """Add comment to GitHub issue."""
-        self._check_rate_limit()
+        self.write_throttle.wait()
 
-        response = session.post(
+        response = self._request(
+            "POST",
             f"{self.api_url}/repos/{org}/{repo_name}/issues/{issue_number}/comments",
-            headers=self.headers,
-            json={"body": comment_body},
-            timeout=self.timeout
+            json={"body": comment_body}
         )
 
-        self._update_rate_limit(response)
-
         if response.status_code != 201:
             self.logger.warning(
                 "Failed to add comment to GitHub issue #%s in %s: %s",
@@ -280,20 +717,34 @@ class GitHubClient:
             return False
         return True
 
+    def list_labels(self, org, repo_name, per_page=100):
+        """Names of the labels defined in a repository, or None if they could not be listed."""
+        names = set()
+        page = 1
+
+        while True:
+            response, labels = self._get_json(
+                f"{self.api_url}/repos/{org}/{repo_name}/labels",
+                params={"per_page": per_page, "page": page}
+            )
+
+            if labels is None:
+                self.logger.warning("Failed to list labels in %s/%s: %s", org, repo_name, response.status_code)
+                return None
+
+            names.update(label["name"] for label in labels)
+
+            if len(labels) < per_page:
+                return names
+            page += 1
+
     def create_label(self, org, repo_name, label_config):
         """Create a label in a GitHub repository."""
-        self._check_rate_limit()
+        self.write_throttle.wait()
 
         url = f"{self.api_url}/repos/{org}/{repo_name}/labels"
 
-        response = session.post(
-            url,
-            json=label_config,
-            headers=self.headers,
-            timeout=self.timeout
-        )
-
-        self._update_rate_limit(response)
+        response = self._request("POST", url, json=label_config)
 
         if response.status_code == 201:
             return True, "created"
@@ -312,31 +763,30 @@ class GitHubClient:
 
     def check_repo_permissions(self, org, repo_name):
         """Check permissions on specific repository."""
-        self._check_rate_limit()
-
         url = f"{self.api_url}/repos/{org}/{repo_name}"
-        response = session.get(url, headers=self.headers, timeout=self.timeout)
+        response, repo_data = self._get_json(url)
 
-        self._update_rate_limit(response)
-
-        if response.status_code == 200:
-            repo_data = response.json()
+        if repo_data is not None:
             permissions = repo_data.get('permissions', {})
             return permissions.get('push', False)
         return False
 
 
 class JiraClient:
-    def __init__(self, env, timeout=60):
+    def __init__(self, env, timeout=60, http_session=None):
         self.api_url = env.jira_api_url
         self.token = env.jira_api_token
         self.timeout = timeout
+        self.session = http_session or session
+        # Issue and comment creation never resend a POST
+        self.write_session = http_session or write_session
         self.headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
         self.logger = logging.getLogger(__name__)
+        self.write_throttle = RequestThrottle()
 
         # Certificate auth
         self.cert = None
@@ -344,15 +794,16 @@ class JiraClient:
             self.cert = (env.jira_cert_path, env.jira_key_path)
             self.logger.info("Using certificate authentication for Jira")
 
-    def search_issues(self, jql, max_results=1, fields=None):
+    def search_issues(self, jql, max_results=1, fields=None, start_at=0):
         if fields is None:
             fields = ["summary"]
 
-        response = session.post(
+        response = self.session.post(
             f"{self.api_url}/rest/api/2/search",
             headers=self.headers,
             json={
                 "jql": jql,
+                "startAt": start_at,
                 "maxResults": max_results,
                 "fields": fields
             },
@@ -368,7 +819,8 @@ class JiraClient:
         return response.json()
 
     def create_issue(self, issue_data):
-        response = session.post(
+        self.write_throttle.wait()
+        response = self.write_session.post(
             f"{self.api_url}/rest/api/2/issue",
             json=issue_data,
             headers=self.headers,
@@ -383,13 +835,61 @@ class JiraClient:
             self.logger.error("Jira error: %s", response.text)
             return None
 
+    def create_issues_bulk(self, issue_data_list, batch_size=50):
+        """Create issues with /issue/bulk, batch_size per request.
+
+        Returns one entry per payload, in order: the created issue, or None if Jira rejected it.
+        """
+        created = []
+
+        for batch_start in range(0, len(issue_data_list), batch_size):
+            batch = issue_data_list[batch_start:batch_start + batch_size]
+
+            self.write_throttle.wait()
+            try:
+                response = self.write_session.post(
+                    f"{self.api_url}/rest/api/2/issue/bulk",
+                    json={"issueUpdates": batch},
+                    headers=self.headers,
+                    timeout=self.timeout,
+                    cert=self.cert,
+                    verify=True
+                )
+            except requests.RequestException as e:
+                # Never resent: whether Jira created the batch is unknown, so it counts as failed
+                self.logger.error("Jira bulk create request failed: %s", e)
+                created.extend([None] * len(batch))
+                continue
+
+            try:
+                result = response.json()
+            except ValueError:
+                result = {}
+
+            if response.status_code not in (201, 400) or not isinstance(result, dict):
+                self.logger.error("Jira bulk create error: %s", response.text)
+                created.extend([None] * len(batch))
+                continue
+
+            # Created issues are listed in payload order, skipping the rejected ones
+            failed = set()
+            for error in result.get("errors", []):
+                failed.add(error.get("failedElementNumber"))
+                self.logger.error("Jira error: %s", error.get("elementErrors"))
+
+            issues = iter(result.get("issues", []))
+            created.extend(None if index in failed else next(issues, None) for index in range(len(batch)))
+
+        return created
+
     def add_comment(self, issue_key, comment_text):
         """Add comment to Jira issue."""
         url = f"{self.api_url}/rest/api/2/issue/{issue_key}/comment"
         payload = {"body": comment_text}
 
+        self.write_throttle.wait()
         try:
-            response = session.post(
+            response = self.write_session.post(
                 url,
                 headers=self.headers,
                 json=payload,
@@ -402,33 +902,127 @@ class JiraClient:
             return False
 
     def check_issue_exists(self, github_issue_number, project_key, repo_name):
-        """Check if GitHub issue already exists in Jira."""
-        jql = f'project = {project_key} AND summary ~ "#{github_issue_number}" AND summary ~ "{repo_name}"'
-        results = self.search_issues(jql)
+        """Check if GitHub issue already exists in Jira, matched like check_issues_exist_bulk."""
+        return int(github_issue_number) in self.check_issues_exist_bulk(project_key, repo_name, [github_issue_number])
+
+    @staticmethod
+    def _imported_issue_numbers(fields, repo_name):
+        """GitHub issue numbers a Jira issue was imported from, as strings.
+
+        The description link is unambiguous; issues without it fall back to standalone
+        numbers in the summary, after the "[repo] " prefix.
+        """
+        linked = _IMPORTED_LINK_RE.findall(fields.get("description") or "")
+        if linked:
+            return linked
+
+        summary = fields.get("summary") or ""
+        prefix = f"[{repo_name}] "
+        if summary.startswith(prefix):
+            summary = summary[len(prefix):]
+        return _SUMMARY_NUMBER_RE.findall(summary)
+
+    def check_issues_exist_bulk(self, project_key, repo_name, issue_numbers, batch_size=50):
+        """Return the GitHub issue numbers already imported to Jira, using one JQL search per batch."""
+        numbers = list(issue_numbers)
+        existing = set()
+
+        for batch_start in range(0, len(numbers), batch_size):
+            batch = numbers[batch_start:batch_start + batch_size]
+            wanted = {str(number) for number in batch}
+            # Imported issues are found by their description link; the summary clause covers hand-made ones
+            link_clause = " OR ".join(f'description ~ "\\"GitHub Issue #{number}\\""' for number in batch)
+            summary_clause = " OR ".join(f'summary ~ "#{number}"' for number in batch)
+            jql = (
+                f'project = {project_key} AND ('
+                f'(description ~ "\\"in repository {repo_name}\\"" AND ({link_clause})) OR '
+                f'(summary ~ "{repo_name}" AND ({summary_clause})))'
+            )
 
-        if results:
-            return results.get("total", 0) > 0
-        return False
+            start_at = 0
+            while True:
+                results = self.search_issues(
+                    jql, max_results=100, fields=["summary", "description"], start_at=start_at)
+                if not results:
+                    break
+
+                found = results.get("issues", [])
+                for issue in found:
+                    tokens = self._imported_issue_numbers(issue.get("fields", {}), repo_name)
+                    existing.update(int(token) for token in tokens if token in wanted)
+
+                start_at += len(found)
+                if not found or start_at >= results.get("total", 0):
+                    break
+
+        return existing
 
 
 class GiteaClient:
-    def __init__(self, env, timeout=10):
+    # Metadata files fetched concurrently when scanning for an org
+    FETCH_WORKERS = 8
+
+    def __init__(self, env, timeout=10, http_session=None):
         self.base_url = env.gitea_url_envs
         self.timeout = timeout
+        self.session = http_session or session
         self.logger = logging.getLogger(__name__)
         self.headers = {}
         if hasattr(env, 'gitea_token') and env.gitea_token:
             self.headers = {"Authorization": f"token {env.gitea_token}"}
+        self.locations_cache_path = env.gitea_locations_cache_path
+        self.locations_ttl = env.gitea_locations_ttl
+        self.refresh_cache = env.refresh_cache
+        self._locations_lock = threading.Lock()
+        # file path -> decoded content; metadata files are shared by every org lookup
+        self._file_cache = {}
+
+    def _read_locations_cache(self):
+        try:
+            with open(self.locations_cache_path, encoding="utf-8") as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _cached_locations(self, org_name):
+        """Affected locations stored on disk for org, or None if missing, expired or disabled"""
+        if self.locations_ttl <= 0 or self.refresh_cache:
+            return None
+        with self._locations_lock:
+            entry = self._read_locations_cache().get(org_name)
+        if entry and time.time() - entry.get("fetched_at", 0) < self.locations_ttl:
+            return entry.get("locations")
+        return None
+
+    def _store_locations(self, org_name, locations):
+        if self.locations_ttl <= 0:
+            return
+        with self._locations_lock:
+            cache = self._read_locations_cache()
+            cache[org_name] = {"locations": locations, "fetched_at": time.time()}
+            try:
+                os.makedirs(os.path.dirname(self.locations_cache_path), exist_ok=True)
+                tmp_path = f"{self.locations_cache_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as cache_file:
+                    json.dump(cache, cache_file)
+                os.replace(tmp_path, self.locations_cache_path)
+            except OSError as e:
+                self.logger.warning("Failed to write affected locations cache: %s", e)
 
     def get_file_content(self, file_path):
-        """Get decoded content of a file from Gitea."""
+        """Get decoded content of a file from Gitea, fetching each path once per client."""
+        cached = self._file_cache.get(file_path)
+        if cached is not None:
+            return cached
+
         try:
             file_url = f"{self.base_url}/{file_path}"
-            response = session.get(file_url, headers=self.headers, timeout=self.timeout)
+            response = self.session.get(file_url, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             file_content_base64 = response.json()['content']
             file_content = base64.b64decode(file_content_base64).decode('utf-8')
 
+            self._file_cache[file_path] = file_content
             return file_content
 
         except Exception as e:
@@ -443,7 +1037,7 @@ class GiteaClient:
             else:
                 url = self.base_url
 
-            response = session.get(url, headers=self.headers, timeout=self.timeout)
+            response = self.session.get(url, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
 
             return response.json()
@@ -453,6 +1047,17 @@ class GiteaClient:
             return None
 
     def get_affected_locations_for_org(self, org_name):
+        """Get affected locations for organization, from the disk cache or Gitea metadata."""
+        locations = self._cached_locations(org_name)
+        if locations:
+            return locations
+
+        locations = self._fetch_affected_locations(org_name)
+        if locations:
+            self._store_locations(org_name, locations)
+        return locations
+
+    def _fetch_affected_locations(self, org_name):
         """Get affected locations from Gitea metadata for organization."""
         try:
             files = self.list_directory()
@@ -460,12 +1065,15 @@ class GiteaClient:
             if not files:
                 return None
 
-            yaml_files = [item for item in files if item['type'] == 'file' and item['name'].endswith('.yaml')]
+            yaml_files = [item['name'] for item in files if item['type'] == 'file' and item['name'].endswith('.yaml')]
+            if not yaml_files:
+                return None
 
-            for file_info in yaml_files:
-                file_name = file_info['name']
-                file_content = self.get_file_content(file_name)
+            # Fetch every file concurrently; map keeps listing order so the first match still wins
+            with ThreadPoolExecutor(max_workers=min(self.FETCH_WORKERS, len(yaml_files))) as executor:
+                contents = list(executor.map(self.get_file_content, yaml_files))
 
+            for file_content in contents:
                 if not file_content:
                     continue
 
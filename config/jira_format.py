@@ -0,0 +1,44 @@
+"""Helpers shared by the import scripts to format GitHub content for Jira"""
+import re
+
+
+# Maximum length of a Jira description field (comments share the limit)
+JIRA_DESCRIPTION_LIMIT = 32767
+
+# Jira wiki horizontal rule between GitHub comments bundled into one Jira comment
+_COMMENT_SEPARATOR = "\n\n----\n\n"
+
+# GitHub image markup converted to Jira wiki images
+_IMG_RE = re.compile(r'<img[^>]+src="([^"]+)"[^>]*>|!\[[^\]]*\]\(([^)]+)\)')
+
+
+def _jira_image(match):
+    """Jira wiki image for an HTML (group 1) or Markdown (group 2) image match."""
+    return f"!{match.group(1) or match.group(2)}!"
+
+
+def convert_github_images_to_jira(text):
+    """Convert GitHub image tags to Jira wiki format."""
+    # Most bodies carry no images; skip the regex scan when neither marker occurs
+    if not text or ("<img" not in text and "![" not in text):
+        return text
+
+    # HTML img tags and Markdown images in a single pass
+    return _IMG_RE.sub(_jira_image, text)
+
+
+def bundle_comments(comment_texts):
+    """Join comments in order into as few texts as fit Jira's size limit; yields (text, comment count)."""
+    bundle = []
+    size = 0
+    for text in comment_texts:
+        text = text[:JIRA_DESCRIPTION_LIMIT]
+        added = len(text) + (len(_COMMENT_SEPARATOR) if bundle else 0)
+        if bundle and size + added > JIRA_DESCRIPTION_LIMIT:
+            yield _COMMENT_SEPARATOR.join(bundle), len(bundle)
+            bundle, size, added = [], 0, len(text)
+        bundle.append(text)
+        size += added
+
+    if bundle:
+        yield _COMMENT_SEPARATOR.join(bundle), len(bundle)
@@ -1,12 +1,14 @@
 """GitHub to JIRA Issue Importer for BUGS"""
+import functools
 import logging
 import os
-import re
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
 
-from config.connections import Database, EnvVariables, GitHubClient, JiraClient, GiteaClient
+from config.connections import Database, EnvVariables, GitHubClient, JiraClient, GiteaClient, ImportCache
 from config.constants import REPO_TO_MASTER_COMPONENT, template_field_map
+from config.jira_format import JIRA_DESCRIPTION_LIMIT, bundle_comments, convert_github_images_to_jira
 
 env_vars = EnvVariables()
 database = Database(env_vars)
@@ -24,7 +26,10 @@ logger = logging.getLogger(__name__)
 IMPORTED_LABEL = os.getenv("IMPORTED_LABEL", "imported-to-jira")
 PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY", "BM")
 ISSUE_TYPE = os.getenv("JIRA_ISSUE_TYPE", "Bug")
-TARGET_SQUADS = [s.strip() for s in os.getenv("TARGET_SQUADS", "Database Squad,Compute Squad").split(",")]
+TARGET_SQUADS = tuple(
+    s.strip() for s in os.getenv("TARGET_SQUADS", "Database Squad,Compute Squad").split(",") if s.strip()
+)
+REPO_WORKERS = int(os.getenv("GIJI_WORKERS", "8"))
 
 
 HARDCODED_VALUES = {
@@ -33,9 +38,27 @@ HARDCODED_VALUES = {
     "priority": "Medium"
 }
 
+# Issue template section headers mapped to parsed field names
+_HEADER_TO_KEY = {
+    "User's Impact": "users_impact",
+    "Document URL": "url",
+    "Description": "description",
+    "Additional Context": "additional_context"
+}
+
+# Jira fields identical for every imported bug
+_STATIC_FIELDS = {
+    "project": {"key": PROJECT_KEY},
+    "issuetype": {"name": ISSUE_TYPE},
+    template_field_map["bug_type"]: [{"value": HARDCODED_VALUES["bug_type"]}],
+    template_field_map["affected_areas"]: [{"value": HARDCODED_VALUES["affected_areas"]}],
+    "priority": {"name": HARDCODED_VALUES["priority"]}
+}
+
 
+@functools.lru_cache(maxsize=None)
 def get_affected_locations_for_org(org):
-    """Get affected locations from Gitea - no fallback, fail if unavailable."""
+    """Get affected locations from Gitea, cached per org - no fallback, fail if unavailable."""
     locations = gitea_client.get_affected_locations_for_org(org)
 
     if not locations:
@@ -44,37 +67,18 @@ def get_affected_locations_for_org(org):
             "Gitea is required for operation - please ensure it is accessible."
         )
 
-    return locations
+    # Tuple so the cached value cannot be mutated by a caller
+    return tuple(locations)
 
 
 def get_repositories_from_db():
-    """Get repositories from target squads using context manager."""
-    repositories = []
-    repo_component_mapping = {}
-
-    # Context manager ensures proper connection cleanup
-    with database.get_connection(env_vars.db_csv) as conn:
-        try:
-            with conn.cursor() as cur:
-                query = """
-                    SELECT "Repository", "Squad", "Title"
-                    FROM repo_title_category
-                    WHERE "Squad" IN %s
-                    ORDER BY "Squad", "Repository"
-                """
-                cur.execute(query, (tuple(TARGET_SQUADS),))
-                logger.info("TARGET_SQUADS: %r", TARGET_SQUADS)
-                results = cur.fetchall()
-                logger.info("Rows returned: %d", len(results))
-
-                for repository, squad, title in results:
-                    repositories.append(repository)
-                    if repository in REPO_TO_MASTER_COMPONENT:
-                        repo_component_mapping[repository] = REPO_TO_MASTER_COMPONENT[repository]
-
-        except Exception as e:
-            logger.error("Error querying database: %s", e)
-            raise
+    """Get repositories from target squads and their master component mapping."""
+    repositories = list(database.get_repositories_by_squads(env_vars.db_csv, TARGET_SQUADS))
+    repo_component_mapping = {
+        repository: REPO_TO_MASTER_COMPONENT[repository]
+        for repository in repositories
+        if repository in REPO_TO_MASTER_COMPONENT
+    }
 
     return repositories, repo_component_mapping
 
@@ -105,8 +109,7 @@ def is_bug_issue(issue):
 
 def is_issue_already_imported(issue):
     """Check if issue has imported label."""
-    labels = [label["name"] for label in issue.get("labels", [])]
-    return IMPORTED_LABEL in labels
+    return any(label["name"] == IMPORTED_LABEL for label in issue.get("labels", []))
 
 
 def parse_github_issue_body(issue_body):
@@ -116,47 +119,24 @@ def parse_github_issue_body(issue_body):
 
     fields = {}
 
-    users_impact_match = re.search(r'### User\'s Impact\s*\n\s*([\s\S]*?)(?:\n\s*###|$)', issue_body, re.DOTALL)
-    if users_impact_match:
-        fields['users_impact'] = users_impact_match.group(1).strip()
-
-    url_match = re.search(r'### Document URL\s*\n\s*([\s\S]*?)(?:\n\s*###|$)', issue_body, re.DOTALL)
-    if url_match:
-        fields['url'] = url_match.group(1).strip()
-
-    description_match = re.search(r'### Description\s*\n\s*([\s\S]*?)(?:\n\s*###|$)', issue_body, re.DOTALL)
-    if description_match:
-        fields['description'] = description_match.group(1).strip()
-
-    additional_context_match = re.search(r'### Additional Context\s*\n\s*([\s\S]*?)(?:\n\s*###|$)',
-                                         issue_body, re.DOTALL)
-    if additional_context_match:
-        fields['additional_context'] = additional_context_match.group(1).strip()
+    # Leading newline lets a body that starts with a header split like any other section
+    for chunk in ("\n" + issue_body).split("\n### ")[1:]:
+        header, _, content = chunk.partition("\n")
+        key = _HEADER_TO_KEY.get(header.strip())
+        if key and key not in fields:
+            fields[key] = content.strip()
 
     return fields
 
 
-def convert_github_images_to_jira(text):
-    """Convert GitHub image tags to Jira format."""
-    if not text:
-        return text
-
-    pattern = r'<img[^>]+src="([^"]+)"[^>]*>'
-    text = re.sub(pattern, lambda m: f"!{m.group(1)}!", text)
-
-    markdown_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
-    text = re.sub(markdown_pattern, lambda m: f"!{m.group(2)}!", text)
-
-    return text
-
-
-def sync_comments_to_jira(jira_issue_key, org, repo, issue_number):
-    """Sync GitHub comments to Jira."""
-    comments = github_client.get_issue_comments(org, repo, issue_number)
+def sync_comments_to_jira(jira_issue_key, org, repo, issue_number, comments=None):
+    """Sync GitHub comments to Jira; fetches them unless already provided."""
+    if comments is None:
+        comments = github_client.get_issue_comments(org, repo, issue_number)
     if not comments:
         return 0
 
-    synced = 0
+    comment_texts = []
     for comment in comments:
         author = comment['user']['login']
         created = comment['created_at'][:10]
@@ -166,13 +146,13 @@ def sync_comments_to_jira(jira_issue_key, org, repo, issue_number):
             continue
 
         body_converted = convert_github_images_to_jira(body)
-        comment_text = f"*Comment by {author} on {created}:*\n\n{body_converted}"
+        comment_texts.append(f"*Comment by {author} on {created}:*\n\n{body_converted}")
 
-        if jira_client.add_comment(jira_issue_key, comment_text):
-            synced += 1
-
-        # Rate limiting delay to prevent GitHub API throttling
-        time.sleep(0.5)
+    # Few large Jira comments instead of one request per GitHub comment; order is kept
+    synced = 0
+    for bundle, count in bundle_comments(comment_texts):
+        if jira_client.add_comment(jira_issue_key, bundle):
+            synced += count
 
     return synced
 
@@ -185,28 +165,28 @@ def get_master_component_for_repo(repo_name, repo_component_mapping):
     return component_key
 
 
-def import_to_jira(issues, repo_name, repo_component_mapping, github_org):
+def import_to_jira(issues, repo_name, repo_component_mapping, github_org, import_cache):
     """Import GitHub issues to Jira."""
     successful_imports = 0
     failed_imports = 0
     skipped_imports = 0
+    pending = []
 
+    # Cheapest filters first; only the remaining candidates are looked up in Jira
+    candidates = []
     for issue in issues:
-        issue_number = issue.get("number")
-
         if "pull_request" in issue:
             continue
 
-        if not is_bug_issue(issue):
+        if import_cache.contains(github_org, repo_name, issue.get("number")):
             skipped_imports += 1
             continue
 
-        if is_issue_already_imported(issue):
+        if not is_bug_issue(issue):
             skipped_imports += 1
             continue
 
-        if jira_client.check_issue_exists(issue_number, PROJECT_KEY, repo_name):
-            github_client.add_label_to_issue(github_org, repo_name, issue_number, [IMPORTED_LABEL])
+        if is_issue_already_imported(issue):
             skipped_imports += 1
             continue
 
@@ -215,10 +195,23 @@ def import_to_jira(issues, repo_name, repo_component_mapping, github_org):
             skipped_imports += 1
             continue
 
+        candidates.append((issue, template_fields))
+
+    existing_numbers = jira_client.check_issues_exist_bulk(
+        PROJECT_KEY, repo_name, [issue.get("number") for issue, _ in candidates]
+    ) if candidates else set()
+
+    for issue, template_fields in candidates:
+        issue_number = issue.get("number")
+
+        if issue_number in existing_numbers:
+            github_client.add_label_to_issue(github_org, repo_name, issue_number, [IMPORTED_LABEL])
+            skipped_imports += 1
+            continue
+
         issue_data = {
             "fields": {
-                "project": {"key": PROJECT_KEY},
-                "issuetype": {"name": ISSUE_TYPE},
+                **_STATIC_FIELDS,
                 "summary": f"[{repo_name}] {issue.get('title', f'GitHub Issue #{issue_number}')}"
             }
         }
@@ -233,16 +226,23 @@ def import_to_jira(issues, repo_name, repo_component_mapping, github_org):
         original_description = template_fields.get('description', issue.get("body", ""))
         original_description = convert_github_images_to_jira(original_description)
 
-        additional_info = ""
+        parts = [original_description]
         if 'url' in template_fields and template_fields['url']:
-            additional_info += f"\n\n**Document URL:**\n{template_fields['url']}"
+            parts.append(f"\n\n**Document URL:**\n{template_fields['url']}")
 
         if 'additional_context' in template_fields and template_fields['additional_context']:
             additional_context = convert_github_images_to_jira(template_fields['additional_context'])
-            additional_info += f"\n\n**Additional Context:**\n{additional_context}"
+            parts.append(f"\n\n**Additional Context:**\n{additional_context}")
+
+        parts.append(github_link_text)
 
-        description_with_link = original_description + additional_info + github_link_text
-        issue_data['fields']["description"] = description_with_link[:32767]
+        # Trim the body to the room the sections and link leave, so the link survives truncation
+        tail = "".join(part for part in parts[1:] if part)
+        budget = max(0, JIRA_DESCRIPTION_LIMIT - len(tail))
+        description = "".join([(original_description or "")[:budget], tail])
+        if len(description) > JIRA_DESCRIPTION_LIMIT:
+            description = description[:JIRA_DESCRIPTION_LIMIT]
+        issue_data['fields']["description"] = description
 
         document_url = template_fields.get('url', '')
         test_category = determine_test_category_from_url(document_url)
@@ -253,45 +253,87 @@ def import_to_jira(issues, repo_name, repo_component_mapping, github_org):
             {"value": location} for location in affected_locations
         ]
 
-        issue_data["fields"][template_field_map["bug_type"]] = [{"value": HARDCODED_VALUES["bug_type"]}]
-        issue_data["fields"][template_field_map["affected_areas"]] = [{"value": HARDCODED_VALUES["affected_areas"]}]
-
         if 'users_impact' in template_fields:
             issue_data["fields"][template_field_map["users_impact"]] = template_fields['users_impact']
 
-        issue_data["fields"]["priority"] = {"name": HARDCODED_VALUES["priority"]}
         issue_data["fields"]["labels"] = ["bug", "github-import", repo_name]
 
-        jira_issue = jira_client.create_issue(issue_data)
+        pending.append((issue_number, issue_data))
 
-        if jira_issue:
-            jira_key = jira_issue["key"]
-            jira_url = f"{env_vars.jira_api_url}/browse/{jira_key}"
-            logger.info("Successfully imported issue #%s -> %s", issue_number, jira_url)
+    # One bulk create request per 50 issues instead of one request per issue
+    created = jira_client.create_issues_bulk([issue_data for _, issue_data in pending]) if pending else []
 
-            comment_count = sync_comments_to_jira(jira_key, github_org, repo_name, issue_number)
-            if comment_count > 0:
-                logger.info("Synced %d comments to %s", comment_count, jira_key)
+    imported = [
+        (issue_number, jira_issue["key"]) for (issue_number, _), jira_issue in zip(pending, created) if jira_issue
+    ]
+    failed_imports += len(pending) - len(imported)
 
-            comment_body = f"This issue has been imported to Jira: {jira_key}"
-            github_client.add_comment_to_issue(github_org, repo_name, issue_number, comment_body)
-            github_client.add_label_to_issue(github_org, repo_name, issue_number, [IMPORTED_LABEL])
+    # Record created issues before any further request, so a failure below cannot cause duplicates on rerun
+    for issue_number, jira_key in imported:
+        import_cache.add(github_org, repo_name, issue_number, jira_key)
 
-            successful_imports += 1
-        else:
-            failed_imports += 1
+    try:
+        comments_by_number = github_client.get_comments_bulk(
+            github_org, repo_name, [issue_number for issue_number, _ in imported])
+    except requests.RequestException as e:
+        # Comments are then fetched per issue by sync_comments_to_jira
+        logger.warning("Bulk comment fetch failed for %s/%s: %s", github_org, repo_name, e)
+        comments_by_number = {}
 
-        # Rate limiting delay to prevent GitHub API throttling
-        time.sleep(0.5)
+    for issue_number, jira_key in imported:
+        jira_url = f"{env_vars.jira_api_url}/browse/{jira_key}"
+        logger.info("Successfully imported issue #%s -> %s", issue_number, jira_url)
+
+        comment_count = sync_comments_to_jira(
+            jira_key, github_org, repo_name, issue_number, comments_by_number.get(issue_number))
+        if comment_count > 0:
+            logger.info("Synced %d comments to %s", comment_count, jira_key)
+
+        comment_body = f"This issue has been imported to Jira: {jira_key}"
+        github_client.add_comment_to_issue(github_org, repo_name, issue_number, comment_body)
+        github_client.add_label_to_issue(github_org, repo_name, issue_number, [IMPORTED_LABEL])
+
+        successful_imports += 1
 
     return successful_imports, failed_imports, skipped_imports
 
 
+def process_repo(github_org, repo_name, repo_component_mapping, import_cache):
+    """Import issues of one repository; returns (imported, failed, skipped) counts."""
+    logger.info("Processing: %s/%s", github_org, repo_name)
+
+    try:
+        issues = github_client.get_issues(github_org, repo_name)
+
+        if not issues:
+            return 0, 0, 0
+
+        successful, failed, skipped = import_to_jira(
+            issues, repo_name, repo_component_mapping, github_org, import_cache
+        )
+
+        return successful, failed, skipped
+
+    except requests.RequestException as e:
+        if "404" in str(e):
+            logger.info("Skipped - repo doesn't exist in org %s: %s", github_org, repo_name)
+        else:
+            logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
+    except Exception as e:
+        logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
+
+    return 0, 0, 0
+
+
 def main():
     logger.info("=" * 80)
     logger.info("GitHub to JIRA Issue Importer for BUGS")
     logger.info("=" * 80)
 
+    import_cache = ImportCache(
+        env_vars.import_cache_path, database, env_vars.db_csv, env_vars.import_cache_table
+    )
+
     try:
         repositories, repo_component_mapping = get_repositories_from_db()
 
@@ -303,35 +345,18 @@ def main():
         total_failed = 0
         total_skipped = 0
 
-        for github_org in env_vars.github_orgs:
-            logger.info("Processing organization: %s", github_org)
-
-            for repo_name in repositories:
-                logger.info("Processing: %s/%s", github_org, repo_name)
-
-                try:
-                    issues = github_client.get_issues(github_org, repo_name)
-
-                    if not issues:
-                        continue
-
-                    successful, failed, skipped = import_to_jira(
-                        issues, repo_name, repo_component_mapping, github_org
-                    )
-
-                    total_successful += successful
-                    total_failed += failed
-                    total_skipped += skipped
+        with ThreadPoolExecutor(max_workers=REPO_WORKERS) as executor:
+            futures = [
+                executor.submit(process_repo, github_org, repo_name, repo_component_mapping, import_cache)
+                for github_org in env_vars.github_orgs
+                for repo_name in repositories
+            ]
 
-                except requests.RequestException as e:
-                    if "404" in str(e):
-                        logger.info("Skipped - repo doesn't exist in org %s: %s", github_org, repo_name)
-                    else:
-                        logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
-                    continue
-                except Exception as e:
-                    logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
-                    continue
+            for future in as_completed(futures):
+                successful, failed, skipped = future.result()
+                total_successful += successful
+                total_failed += failed
+                total_skipped += skipped
 
         logger.info("=" * 80)
         logger.info("SUMMARY: Imported: %s, Failed: %s, Skipped: %s",
@@ -343,6 +368,8 @@ def main():
     finally:
         # Ensure connection pool is properly closed
         database.close_pool()
+        import_cache.close()
+        github_client.close()
 
 
 if __name__ == "__main__":
@@ -1,12 +1,14 @@
 """Module for bulk importing GitHub issues to Jira."""
+import functools
 import logging
 import os
-import re
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
 
-from config.connections import Database, EnvVariables, GitHubClient, JiraClient, GiteaClient
+from config.connections import Database, EnvVariables, GitHubClient, JiraClient, GiteaClient, ImportCache
 from config.constants import REPO_TO_MASTER_COMPONENT, template_field_map
+from config.jira_format import JIRA_DESCRIPTION_LIMIT, bundle_comments, convert_github_images_to_jira
 
 env_vars = EnvVariables()
 database = Database(env_vars)
@@ -22,9 +24,14 @@ logger = logging.getLogger(__name__)
 
 # Configuration from environment variables (Vault)
 IMPORTED_LABELS = ["imported-to-jira", "bulk"]
+IMPORTED_LABELS_SET = frozenset(IMPORTED_LABELS)
 PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY", "BM")
 ISSUE_TYPE = os.getenv("JIRA_ISSUE_TYPE", "Bug")
-TARGET_SQUADS = [s.strip() for s in os.getenv("TARGET_SQUADS", "Database Squad,Compute Squad").split(",")]
+TARGET_SQUADS = tuple(
+    s.strip() for s in os.getenv("TARGET_SQUADS", "Database Squad,Compute Squad").split(",") if s.strip()
+)
+REPO_WORKERS = int(os.getenv("GIJI_WORKERS", "8"))
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "4"))
 
 
 # Static values - these rarely change and don't need Vault
@@ -35,9 +42,21 @@ HARDCODED_VALUES = {
     "test_category": "QA"
 }
 
+# Jira fields identical for every bulk imported issue
+_STATIC_FIELDS = {
+    "project": {"key": PROJECT_KEY},
+    "issuetype": {"name": ISSUE_TYPE},
+    template_field_map["test_category"]: {"value": HARDCODED_VALUES["test_category"]},
+    template_field_map["bug_type"]: [{"value": HARDCODED_VALUES["bug_type"]}],
+    template_field_map["affected_areas"]: [{"value": HARDCODED_VALUES["affected_areas"]}],
+    template_field_map["users_impact"]: "Not specified - bulk imported from unlabeled issue",
+    "priority": {"name": HARDCODED_VALUES["priority"]}
+}
+
 
+@functools.lru_cache(maxsize=None)
 def get_affected_locations_for_org(org_name):
-    """Get affected locations from Gitea - no fallback, fail if unavailable."""
+    """Get affected locations from Gitea, cached per org - no fallback, fail if unavailable."""
     locations = gitea_client.get_affected_locations_for_org(org_name)
 
     if not locations:
@@ -46,66 +65,24 @@ def get_affected_locations_for_org(org_name):
             "Gitea is required for operation - please ensure it is accessible."
         )
 
-    return locations
+    # Tuple so the cached value cannot be mutated by a caller
+    return tuple(locations)
 
 
 def get_repositories_from_db():
-    """Get repositories from target squads using context manager."""
-    repositories = []
-
-    # Context manager ensures proper connection cleanup
-    with database.get_connection(env_vars.db_csv) as conn:
-        try:
-            with conn.cursor() as cur:
-                query = """
-                    SELECT "Repository", "Squad", "Title"
-                    FROM repo_title_category
-                    WHERE "Squad" IN %s
-                    ORDER BY "Squad", "Repository"
-                """
-
-                cur.execute(query, (tuple(TARGET_SQUADS),))
-                logger.info("TARGET_SQUADS: %r", TARGET_SQUADS)
-                results = cur.fetchall()
-                logger.info("Rows returned: %d", len(results))
-
-                if not results:
-                    return []
-
-                for repository, squad, title in results:
-                    repositories.append(repository)
-
-        except Exception as e:
-            logger.error("Error querying database: %s", e)
-            raise
-
-    return repositories
-
-
-def convert_github_images_to_jira(text):
-    """Convert GitHub image tags to Jira wiki format."""
-    if not text:
-        return text
-
-    # HTML img tags
-    pattern = r'<img[^>]+src="([^"]+)"[^>]*>'
-    text = re.sub(pattern, lambda m: f"!{m.group(1)}!", text)
-
-    # Markdown images
-    markdown_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
-    text = re.sub(markdown_pattern, lambda m: f"!{m.group(2)}!", text)
+    """Get repositories from target squads."""
+    return list(database.get_repositories_by_squads(env_vars.db_csv, TARGET_SQUADS))
 
-    return text
 
-
-def sync_comments_to_jira(jira_issue_key, github_org, repo_name, issue_number):
-    """Sync GitHub comments to Jira issue."""
-    comments = github_client.get_issue_comments(github_org, repo_name, issue_number)
+def sync_comments_to_jira(jira_issue_key, github_org, repo_name, issue_number, comments=None):
+    """Sync GitHub comments to Jira issue; fetches them unless already provided."""
+    if comments is None:
+        comments = github_client.get_issue_comments(github_org, repo_name, issue_number)
 
     if not comments:
         return 0
 
-    synced = 0
+    comment_texts = []
     for comment in comments:
         author = comment['user']['login']
         created = comment['created_at'][:10]
@@ -115,27 +92,19 @@ def sync_comments_to_jira(jira_issue_key, github_org, repo_name, issue_number):
             continue
 
         body_converted = convert_github_images_to_jira(body)
-        comment_text = f"*Comment by {author} on {created}:*\n\n{body_converted}"
+        comment_texts.append(f"*Comment by {author} on {created}:*\n\n{body_converted}")
 
-        if jira_client.add_comment(jira_issue_key, comment_text):
-            synced += 1
-
-        # Rate limiting delay to prevent GitHub API throttling
-        time.sleep(0.5)
+    synced = 0
+    for bundle, count in bundle_comments(comment_texts):
+        if jira_client.add_comment(jira_issue_key, bundle):
+            synced += count
 
     return synced
 
 
-def has_no_labels(issue):
-    """Check if issue has no labels."""
-    labels = issue.get("labels", [])
-    return len(labels) == 0
-
-
 def is_issue_already_imported(issue):
     """Check if already imported."""
-    labels = [label["name"] for label in issue.get("labels", [])]
-    return any(imported_label in labels for imported_label in IMPORTED_LABELS)
+    return not IMPORTED_LABELS_SET.isdisjoint(label["name"] for label in issue.get("labels", []))
 
 
 def get_master_component_for_repo(repo_name):
@@ -146,104 +115,158 @@ def get_master_component_for_repo(repo_name):
     return component_key
 
 
-def bulk_import_to_jira(issues, repo_name, github_org):
-    """Bulk import issues."""
-    successful_imports = 0
-    failed_imports = 0
-    skipped_imports = 0
-
-    for issue in issues:
-        issue_number = issue.get("number")
+def check_issue(issue, repo_name, github_org, import_cache):
+    """Local checks only; returns "candidate" if the issue still needs a Jira lookup, else "skipped"."""
+    if import_cache.contains(github_org, repo_name, issue.get("number")):
+        return "skipped"
 
-        if "pull_request" in issue:
-            continue
+    if is_issue_already_imported(issue):
+        return "skipped"
 
-        if not has_no_labels(issue):
-            skipped_imports += 1
-            continue
+    return "candidate"
 
-        if is_issue_already_imported(issue):
-            skipped_imports += 1
-            continue
 
-        if jira_client.check_issue_exists(issue_number, PROJECT_KEY, repo_name):
-            github_client.add_label_to_issue(github_org, repo_name, issue_number, IMPORTED_LABELS)
-            skipped_imports += 1
-            continue
+def build_issue_data(issue, repo_name, github_org):
+    """Build the Jira payload for a GitHub issue."""
+    issue_number = issue.get("number")
 
-        issue_data = {
-            "fields": {
-                "project": {"key": PROJECT_KEY},
-                "issuetype": {"name": ISSUE_TYPE},
-                "summary": f"[{repo_name}] {issue.get('title', f'GitHub Issue #{issue_number}')}"
-            }
+    issue_data = {
+        "fields": {
+            **_STATIC_FIELDS,
+            "summary": f"[{repo_name}] {issue.get('title', f'GitHub Issue #{issue_number}')}"
         }
+    }
 
-        master_component_key = get_master_component_for_repo(repo_name)
-        issue_data["fields"][template_field_map["master_component"]] = [{"key": master_component_key}]
+    master_component_key = get_master_component_for_repo(repo_name)
+    issue_data["fields"][template_field_map["master_component"]] = [{"key": master_component_key}]
 
-        github_issue_url = issue.get('html_url')
-        github_link_text = (f"\n\n*Bulk imported from [GitHub Issue #{issue_number}]({github_issue_url}) "
-                            f"in repository {repo_name}*")
+    github_issue_url = issue.get('html_url')
+    github_link_text = (f"\n\n*Bulk imported from [GitHub Issue #{issue_number}]({github_issue_url}) "
+                        f"in repository {repo_name}*")
 
-        issue_body = issue.get("body", "")
-        if not issue_body:
-            issue_body = "No description provided"
+    issue_body = issue.get("body", "")
+    if not issue_body:
+        issue_body = "No description provided"
 
-        # Convert images in body
-        issue_body = convert_github_images_to_jira(issue_body)
+    # Convert images in body
+    issue_body = convert_github_images_to_jira(issue_body)
 
-        description_with_link = issue_body + github_link_text
-        issue_data['fields']["description"] = description_with_link[:32767]
+    # Trim the body, not the link, when the description is too long
+    budget = max(0, JIRA_DESCRIPTION_LIMIT - len(github_link_text))
+    description = "".join([issue_body[:budget], github_link_text])
+    issue_data['fields']["description"] = description
 
-        issue_data["fields"][template_field_map["test_category"]] = {
-            "value": HARDCODED_VALUES["test_category"]
-        }
+    # Affected locations from Gitea - will raise if unavailable
+    affected_locations = get_affected_locations_for_org(github_org)
+    issue_data["fields"][template_field_map["affected_locations"]] = [
+        {"value": location} for location in affected_locations
+    ]
 
-        # Affected locations from Gitea - will raise if unavailable
-        affected_locations = get_affected_locations_for_org(github_org)
-        issue_data["fields"][template_field_map["affected_locations"]] = [
-            {"value": location} for location in affected_locations
-        ]
+    issue_data["fields"]["labels"] = ["bulk-import", "github-import", repo_name]
 
-        issue_data["fields"][template_field_map["bug_type"]] = [
-            {"value": HARDCODED_VALUES["bug_type"]}
-        ]
+    return issue_data
 
-        issue_data["fields"][template_field_map["affected_areas"]] = [
-            {"value": HARDCODED_VALUES["affected_areas"]}
-        ]
 
-        issue_data["fields"][template_field_map["users_impact"]] = "Not specified - bulk imported from unlabeled issue"
+def finish_import(issue, jira_key, repo_name, github_org, comments_by_number, comment_executor):
+    """Sync the comments of an imported issue and mark it on GitHub."""
+    issue_number = issue.get("number")
+    jira_url = f"{env_vars.jira_api_url}/browse/{jira_key}"
+    logger.info("Successfully imported issue #%s -> %s", issue_number, jira_url)
 
-        issue_data["fields"]["priority"] = {"name": HARDCODED_VALUES["priority"]}
+    # The Jira comment sync overlaps the GitHub writes, which share one write throttle and so run inline
+    comment_sync = comment_executor.submit(
+        sync_comments_to_jira,
+        jira_key, github_org, repo_name, issue_number, comments_by_number.get(issue_number))
 
-        issue_data["fields"]["labels"] = ["bulk-import", "github-import", repo_name]
+    comment_body = f"This issue has been imported to Jira: {jira_key}"
+    github_client.add_comment_to_issue(github_org, repo_name, issue_number, comment_body)
+    github_client.add_label_to_issue(github_org, repo_name, issue_number, IMPORTED_LABELS)
 
-        jira_issue = jira_client.create_issue(issue_data)
+    comment_count = comment_sync.result()
+    if comment_count > 0:
+        logger.info("Synced %d comments to %s", comment_count, jira_key)
 
-        if jira_issue:
-            jira_key = jira_issue["key"]
-            jira_url = f"{env_vars.jira_api_url}/browse/{jira_key}"
-            logger.info("Successfully imported issue #%s -> %s", issue_number, jira_url)
 
-            # Sync comments
-            comment_count = sync_comments_to_jira(jira_key, github_org, repo_name, issue_number)
-            if comment_count > 0:
-                logger.info("Synced %d comments to %s", comment_count, jira_key)
+def bulk_import_to_jira(issues, repo_name, github_org, import_cache, comments_by_number=None):
+    """Bulk import issues: one Jira bulk create per 50 issues, then follow-ups several at a time."""
+    if comments_by_number is None:
+        comments_by_number = {}
 
-            comment_body = f"This issue has been imported to Jira: {jira_key}"
-            github_client.add_comment_to_issue(github_org, repo_name, issue_number, comment_body)
-            github_client.add_label_to_issue(github_org, repo_name, issue_number, IMPORTED_LABELS)
+    # Local checks first; only the remaining candidates are looked up in Jira
+    candidates = [issue for issue in issues if check_issue(issue, repo_name, github_org, import_cache) == "candidate"]
+    skipped = len(issues) - len(candidates)
+
+    existing_numbers = jira_client.check_issues_exist_bulk(
+        PROJECT_KEY, repo_name, [issue.get("number") for issue in candidates]
+    ) if candidates else set()
 
-            successful_imports += 1
+    to_import = []
+    for issue in candidates:
+        issue_number = issue.get("number")
+        if issue_number in existing_numbers:
+            github_client.add_label_to_issue(github_org, repo_name, issue_number, IMPORTED_LABELS)
+            skipped += 1
         else:
-            failed_imports += 1
+            to_import.append(issue)
+
+    if not to_import:
+        return 0, 0, skipped
+
+    created = jira_client.create_issues_bulk(
+        [build_issue_data(issue, repo_name, github_org) for issue in to_import]
+    )
+    imported = [(issue, jira_issue["key"]) for issue, jira_issue in zip(to_import, created) if jira_issue]
+
+    # Record every created issue before any follow-up can fail
+    for issue, jira_key in imported:
+        import_cache.add(github_org, repo_name, issue.get("number"), jira_key)
+
+    # Client throttles pace the GitHub and Jira writes of the workers; comment syncs share one extra pool
+    with ThreadPoolExecutor(max_workers=IMPORT_WORKERS) as executor, \
+            ThreadPoolExecutor(max_workers=IMPORT_WORKERS) as comment_executor:
+        list(executor.map(
+            lambda pair: finish_import(
+                pair[0], pair[1], repo_name, github_org, comments_by_number, comment_executor),
+            imported))
+
+    return len(imported), len(to_import) - len(imported), skipped
+
+
+def process_repo(github_org, repo_name, import_cache):
+    """Import issues of one repository; returns (imported, failed, skipped) counts."""
+    logger.info("Processing: %s/%s", github_org, repo_name)
+
+    try:
+        # Only unlabeled issues are bulk imported, so the search filters out labeled ones on the server
+        issues, comments_by_number = github_client.fetch_issues_with_comments_graphql(
+            github_org, repo_name, search_filter="no:label")
+
+        # The search index can lag behind label changes, so the live labels are checked as well
+        unlabeled = [issue for issue in issues if not issue["labels"]]
+        labeled = len(issues) - len(unlabeled)
 
-        # Rate limiting delay to prevent GitHub API throttling
-        time.sleep(0.5)
+        if not unlabeled:
+            return 0, 0, labeled
 
-    return successful_imports, failed_imports, skipped_imports
+        successful, failed, skipped = bulk_import_to_jira(
+            unlabeled, repo_name, github_org, import_cache, comments_by_number)
+        skipped += labeled
+
+        logger.info(
+            "%s/%s: Imported=%d, Failed=%d, Skipped=%d",
+            github_org, repo_name, successful, failed, skipped)
+
+        return successful, failed, skipped
+
+    except requests.RequestException as e:
+        if "404" in str(e):
+            logger.info("Skipped - repo doesn't exist in org %s: %s", github_org, repo_name)
+        else:
+            logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
+    except Exception as e:
+        logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
+
+    return 0, 0, 0
 
 
 def main():
@@ -251,6 +274,10 @@ def main():
     logger.info("GitHub to JIRA BULK IMPORTER")
     logger.info("=" * 80)
 
+    import_cache = ImportCache(
+        env_vars.import_cache_path, database, env_vars.db_csv, env_vars.import_cache_table
+    )
+
     try:
         repositories = get_repositories_from_db()
 
@@ -262,38 +289,18 @@ def main():
         total_failed = 0
         total_skipped = 0
 
-        for github_org in env_vars.github_orgs:
-            logger.info("Processing organization: %s", github_org)
-
-            for repo_name in repositories:
-                logger.info("Processing: %s/%s", github_org, repo_name)
-
-                try:
-                    issues = github_client.get_all_issues_paginated(github_org, repo_name)
-
-                    if not issues:
-                        continue
-
-                    successful, failed, skipped = bulk_import_to_jira(
-                        issues, repo_name, github_org)
-
-                    logger.info(
-                        "%s/%s: Imported=%d, Failed=%d, Skipped=%d",
-                        github_org, repo_name, successful, failed, skipped)
-
-                    total_successful += successful
-                    total_failed += failed
-                    total_skipped += skipped
+        with ThreadPoolExecutor(max_workers=REPO_WORKERS) as executor:
+            futures = [
+                executor.submit(process_repo, github_org, repo_name, import_cache)
+                for github_org in env_vars.github_orgs
+                for repo_name in repositories
+            ]
 
-                except requests.RequestException as e:
-                    if "404" in str(e):
-                        logger.info("Skipped - repo doesn't exist in org %s: %s", github_org, repo_name)
-                    else:
-                        logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
-                    continue
-                except Exception as e:
-                    logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
-                    continue
+            for future in as_completed(futures):
+                successful, failed, skipped = future.result()
+                total_successful += successful
+                total_failed += failed
+                total_skipped += skipped
 
         logger.info("=" * 80)
         logger.info(
@@ -306,6 +313,8 @@ def main():
     finally:
         # If pool is properly closed
         database.close_pool()
+        import_cache.close()
+        github_client.close()
 
 
 if __name__ == "__main__":
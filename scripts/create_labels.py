@@ -2,17 +2,18 @@
 """GitHub Labels Creator for repositories from database."""
 
 import logging
-import time
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import psycopg2
-
-from config import Database, EnvVariables, GitHubClient
+from config.connections import Database, EnvVariables, GitHubClient
 
 env_vars = EnvVariables()
 database = Database(env_vars)
 github_client = GitHubClient(env_vars)
 
-TARGET_SQUADS = ["Database Squad", "Compute Squad"]
+TARGET_SQUADS = ("Database Squad", "Compute Squad")
+REPO_WORKERS = int(os.getenv("GIJI_WORKERS", "8"))
 
 LABELS_TO_CREATE = [
     {
@@ -51,29 +52,33 @@ logger = logging.getLogger(__name__)
 
 def get_repositories_from_db():
     """Get repositories from target squads."""
-    conn = database.connect_to_db(env_vars.db_csv)
-    repositories = []
+    return list(database.get_repositories_by_squads(env_vars.db_csv, TARGET_SQUADS))
 
-    try:
-        cur = conn.cursor()
-        query = """
-            SELECT "Repository", "Squad", "Title"
-            FROM repo_title_category
-            WHERE "Squad" IN %s
-            ORDER BY "Squad", "Repository"
-        """
-        cur.execute(query, (tuple(TARGET_SQUADS),))
-        results = cur.fetchall()
-
-        for repository, squad, title in results:
-            repositories.append(repository)
-
-        return repositories
-    except psycopg2.Error as e:
-        logger.error("Error querying database: %s", e)
-        raise
-    finally:
-        conn.close()
+
+def process_repo(github_org, repo_name):
+    """Create all labels in one repository; returns True if every label was processed."""
+    logger.info("Processing %s/%s...", github_org, repo_name)
+
+    # Only labels missing from the repository need a create request
+    existing = github_client.list_labels(github_org, repo_name)
+    if existing is None:
+        missing = LABELS_TO_CREATE
+    else:
+        missing = [label_config for label_config in LABELS_TO_CREATE if label_config["name"] not in existing]
+
+    repo_success = len(LABELS_TO_CREATE) - len(missing)
+    for label_config in missing:
+        success, status = github_client.create_label(github_org, repo_name, label_config)
+        if success:
+            repo_success += 1
+
+    if repo_success == len(LABELS_TO_CREATE):
+        return True
+
+    logger.warning(
+        "%s/%s - %d/%d labels processed",
+        github_org, repo_name, repo_success, len(LABELS_TO_CREATE))
+    return False
 
 
 def main():
@@ -91,9 +96,6 @@ def main():
 
         logger.info("Found %d repositories", len(repositories))
 
-        total_successful = 0
-        total_failed = 0
-
         for github_org in env_vars.github_orgs:
             logger.info("Processing organization: %s", github_org)
 
@@ -104,23 +106,15 @@ def main():
                 if not has_permissions:
                     logger.warning("Limited permissions detected for %s. Some operations may fail.", github_org)
 
-            for repo_name in repositories:
-                logger.info("Processing %s/%s...", github_org, repo_name)
+        with ThreadPoolExecutor(max_workers=REPO_WORKERS) as executor:
+            futures = [
+                executor.submit(process_repo, github_org, repo_name)
+                for github_org in env_vars.github_orgs
+                for repo_name in repositories
+            ]
 
-                repo_success = 0
-                for label_config in LABELS_TO_CREATE:
-                    success, status = github_client.create_label(github_org, repo_name, label_config)
-                    if success:
-                        repo_success += 1
-                    time.sleep(0.3)
-
-                if repo_success == len(LABELS_TO_CREATE):
-                    total_successful += 1
-                else:
-                    total_failed += 1
-                    logger.warning(
-                        "%s/%s - %d/%d labels processed",
-                        github_org, repo_name, repo_success, len(LABELS_TO_CREATE))
+            # True for fully processed repositories, False for those with failures
+            results = Counter(future.result() for future in as_completed(futures))
 
         # Summary
         logger.info("=" * 60)
@@ -128,11 +122,14 @@ def main():
         logger.info("=" * 60)
         logger.info("Total organizations: %d", len(env_vars.github_orgs))
         logger.info("Total repositories per org: %d", len(repositories))
-        logger.info("Fully successful: %d", total_successful)
-        logger.info("Had issues: %d", total_failed)
+        logger.info("Fully successful: %d", results[True])
+        logger.info("Had issues: %d", results[False])
 
     except Exception as e:
         logger.error("Critical error: %s", e, exc_info=True)
+    finally:
+        database.close_pool()
+        github_client.close()
 
 
 if __name__ == "__main__":
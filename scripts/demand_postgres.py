@@ -1,30 +1,27 @@
 """GitHub to JIRA Issue Importer for DEMAND"""
+import functools
 import logging
 import os
 import re
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import SimpleNamespace
+
 import requests
 
-from config.connections import Database, EnvVariables, GitHubClient, JiraClient, GiteaClient
+from config.connections import Database, EnvVariables, GitHubClient, JiraClient, GiteaClient, ImportCache
 from config.constants import REPO_TO_MASTER_COMPONENT, template_field_map
+from config.jira_format import JIRA_DESCRIPTION_LIMIT, bundle_comments, convert_github_images_to_jira
 
-env_vars = EnvVariables()
-database = Database(env_vars)
-github_client = GitHubClient(env_vars)
-jira_client = JiraClient(env_vars)
-gitea_client = GiteaClient(env_vars)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # Configuration from environment variables (Vault)
 IMPORTED_LABEL = os.getenv("IMPORTED_LABEL", "imported-to-jira")
 PROJECT_KEY = os.getenv("JIRA_PROJECT_KEY_DEMAND", "OTCPR")
 ISSUE_TYPE_ID = os.getenv("JIRA_ISSUE_TYPE_ID_DEMAND", "11001")
-TARGET_SQUADS = [s.strip() for s in os.getenv("TARGET_SQUADS", "Database Squad,Compute Squad").split(",")]
+TARGET_SQUADS = tuple(
+    s.strip() for s in os.getenv("TARGET_SQUADS", "Database Squad,Compute Squad").split(",") if s.strip()
+)
+REPO_WORKERS = int(os.getenv("GIJI_WORKERS", "8"))
 
 # Static values - these rarely change and don't need Vault
 HARDCODED_VALUES = {
@@ -34,9 +31,34 @@ HARDCODED_VALUES = {
     "tier": "14637"
 }
 
+# Issue template section headers mapped to parsed field names
+_HEADER_TO_KEY = {
+    "Summary": "summary",
+    "Feature Description": "feature_description",
+    "Documents Requested": "doc_type",
+    "Additional Context": "additional_context"
+}
+
+# Jira fields identical for every imported demand
+_STATIC_FIELDS = {
+    "project": {"key": PROJECT_KEY},
+    "issuetype": {"id": ISSUE_TYPE_ID},
+    "priority": {"name": HARDCODED_VALUES["priority"]},
+    template_field_map["estimated_effort"]: {"id": HARDCODED_VALUES["estimated_effort"]},
+    template_field_map["tier"]: {"id": HARDCODED_VALUES["tier"]},
+    template_field_map["pays_into"]: [{"id": HARDCODED_VALUES["pays_into"]}]
+}
+
+# Checked boxes in the "Documents Requested" checklist
+_CHECKED_RE = re.compile(r'^[ \t]*- \[x\][ \t]*(.*)$', re.MULTILINE)
+
+# Master component used for repositories missing from the mapping
+_FALLBACK_COMPONENT = next(iter(REPO_TO_MASTER_COMPONENT.values()))
 
-def get_affected_locations_for_org(org_name):
-    """Get affected locations from Gitea - no fallback, fail if unavailable."""
+
+@functools.lru_cache(maxsize=None)
+def get_affected_locations_for_org(gitea_client, org_name):
+    """Get affected locations from Gitea, cached per org - no fallback, fail if unavailable."""
     locations = gitea_client.get_affected_locations_for_org(org_name)
 
     if not locations:
@@ -45,69 +67,31 @@ def get_affected_locations_for_org(org_name):
             "Gitea is required for operation - please ensure it is accessible."
         )
 
-    return locations
-
-
-def get_repositories_from_db():
-    """Get repositories from target squads using context manager."""
-    repositories = []
-    repo_component_mapping = {}
-
-    # Context manager ensures proper connection cleanup
-    with database.get_connection(env_vars.db_csv) as conn:
-        try:
-            with conn.cursor() as cur:
-                query = """
-                    SELECT "Repository", "Squad", "Title"
-                    FROM repo_title_category
-                    WHERE "Squad" IN %s
-                    ORDER BY "Squad", "Repository"
-                """
-
-                cur.execute(query, (tuple(TARGET_SQUADS),))
-                logger.info("TARGET_SQUADS: %r", TARGET_SQUADS)
-                results = cur.fetchall()
-                logger.info("Rows returned: %d", len(results))
+    # Tuple so the cached value cannot be mutated by a caller
+    return tuple(locations)
 
-                if not results:
-                    return [], {}
 
-                for repository, squad, title in results:
-                    repositories.append(repository)
-                    if repository in REPO_TO_MASTER_COMPONENT:
-                        repo_component_mapping[repository] = REPO_TO_MASTER_COMPONENT[repository]
-
-        except Exception as e:
-            logger.error("Error querying database: %s", e)
-            raise
+def get_repositories_from_db(clients):
+    """Get repositories from target squads and their master component mapping."""
+    repositories = list(clients.database.get_repositories_by_squads(clients.env_vars.db_csv, TARGET_SQUADS))
+    repo_component_mapping = {
+        repository: REPO_TO_MASTER_COMPONENT[repository]
+        for repository in repositories
+        if repository in REPO_TO_MASTER_COMPONENT
+    }
 
     return repositories, repo_component_mapping
 
 
-def convert_github_images_to_jira(text):
-    """Convert GitHub image tags to Jira wiki format."""
-    if not text:
-        return text
-
-    # HTML img tags
-    pattern = r'<img[^>]+src="([^"]+)"[^>]*>'
-    text = re.sub(pattern, lambda m: f"!{m.group(1)}!", text)
-
-    # Markdown images
-    markdown_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
-    text = re.sub(markdown_pattern, lambda m: f"!{m.group(2)}!", text)
-
-    return text
-
-
-def sync_comments_to_jira(jira_issue_key, github_org, repo_name, issue_number):
-    """Sync GitHub comments to Jira issue."""
-    comments = github_client.get_issue_comments(github_org, repo_name, issue_number)
+def sync_comments_to_jira(clients, jira_issue_key, github_org, repo_name, issue_number, comments=None):
+    """Sync GitHub comments to Jira issue; fetches them unless already provided."""
+    if comments is None:
+        comments = clients.github_client.get_issue_comments(github_org, repo_name, issue_number)
 
     if not comments:
         return 0
 
-    synced = 0
+    comment_texts = []
     for comment in comments:
         author = comment['user']['login']
         created = comment['created_at'][:10]
@@ -117,31 +101,41 @@ def sync_comments_to_jira(jira_issue_key, github_org, repo_name, issue_number):
             continue
 
         body_converted = convert_github_images_to_jira(body)
-        comment_text = f"*Comment by {author} on {created}:*\n\n{body_converted}"
+        comment_texts.append(f"*Comment by {author} on {created}:*\n\n{body_converted}")
 
-        if jira_client.add_comment(jira_issue_key, comment_text):
-            synced += 1
-
-        # Rate limiting delay to prevent GitHub API throttling
-        time.sleep(0.5)
+    synced = 0
+    for bundle, count in bundle_comments(comment_texts):
+        if clients.jira_client.add_comment(jira_issue_key, bundle):
+            synced += count
 
     return synced
 
 
+def _classify(issue):
+    """Return (is_demand, is_imported) from a single pass over the issue labels."""
+    is_demand = False
+    is_imported = False
+    for label in issue.get("labels", []):
+        name = label["name"]
+        if name == IMPORTED_LABEL:
+            is_imported = True
+        elif name.lower() == "demand":
+            is_demand = True
+
+    if not is_demand:
+        # Only the prefix matters; avoid upper-casing the whole title
+        is_demand = (issue.get("title") or "")[:8].upper() == "[DEMAND]"
+    return is_demand, is_imported
+
+
 def is_demand_issue(issue):
     """Check if issue is a demand."""
-    labels = [label["name"].lower() for label in issue.get("labels", [])]
-    if "demand" in labels:
-        return True
-
-    title = issue.get("title", "").upper()
-    return title.startswith("[DEMAND]")
+    return _classify(issue)[0]
 
 
 def is_issue_already_imported(issue):
     """Check if issue has imported label."""
-    labels = [label["name"] for label in issue.get("labels", [])]
-    return IMPORTED_LABEL in labels
+    return _classify(issue)[1]
 
 
 def parse_github_issue_body(issue_body):
@@ -151,83 +145,77 @@ def parse_github_issue_body(issue_body):
 
     fields = {}
 
-    summary_match = re.search(
-        r'### Summary\s*\n\s*([\s\S]*?)(?:\n\s*###|$)', issue_body, re.DOTALL)
-    if summary_match:
-        fields['summary'] = summary_match.group(1).strip()
-
-    feature_description_match = re.search(
-        r'### Feature Description\s*\n\s*([\s\S]*?)(?:\n\s*###|$)',
-        issue_body, re.DOTALL)
-    if feature_description_match:
-        fields['feature_description'] = feature_description_match.group(1).strip()
-
-    doc_type_match = re.search(
-        r'### Documents Requested\s*\n\s*([\s\S]*?)(?:\n\s*###|$)',
-        issue_body, re.DOTALL)
-    if doc_type_match:
-        doc_type_block = doc_type_match.group(1)
-        doc_types = []
-        for line in doc_type_block.strip().split('\n'):
-            if line.strip().startswith('- [x]'):
-                doc_type = re.search(r'- \[x\]\s*(.*)', line)
-                if doc_type:
-                    doc_types.append(doc_type.group(1).strip())
-        fields['doc_type'] = doc_types
-
-    additional_context_match = re.search(
-        r'### Additional Context\s*\n\s*([\s\S]*?)(?:\n\s*###|$)',
-        issue_body, re.DOTALL)
-    if additional_context_match:
-        fields['additional_context'] = additional_context_match.group(1).strip()
+    # Leading newline lets a body that starts with a header split like any other section
+    for chunk in ("\n" + issue_body).split("\n### ")[1:]:
+        header, _, content = chunk.partition("\n")
+        key = _HEADER_TO_KEY.get(header.strip())
+        if not key or key in fields:
+            continue
+
+        if key == 'doc_type':
+            # Ordered for the description, deduplicated and immutable for membership checks
+            fields['doc_type'] = tuple(dict.fromkeys(doc_type.strip() for doc_type in _CHECKED_RE.findall(content)))
+        else:
+            fields[key] = content.strip()
 
     return fields
 
 
 def get_master_component_for_repo(repo_name, repo_component_mapping):
     """Get master component key for repository."""
-    component_key = repo_component_mapping.get(repo_name)
-    if not component_key:
-        # Fallback to first available component
-        component_key = list(REPO_TO_MASTER_COMPONENT.values())[0]
-    return component_key
+    # Falls back to the first available component
+    return repo_component_mapping.get(repo_name) or _FALLBACK_COMPONENT
 
 
-def import_to_jira(issues, repo_name, repo_component_mapping, github_org):
+def import_to_jira(clients, issues, repo_name, repo_component_mapping, github_org, import_cache):
     """Import GitHub issues to Jira."""
     successful_imports = 0
     failed_imports = 0
     skipped_imports = 0
+    pending = []
 
+    # Cheapest filters first; only the remaining candidates are looked up in Jira
+    candidates = []
     for issue in issues:
-        issue_number = issue.get("number")
-
         if "pull_request" in issue:
             continue
 
-        if not is_demand_issue(issue):
+        if import_cache.contains(github_org, repo_name, issue.get("number")):
             skipped_imports += 1
             continue
 
-        if is_issue_already_imported(issue):
+        body = issue.get("body") or ""
+        if not body:
             skipped_imports += 1
             continue
 
-        if jira_client.check_issue_exists(issue_number, PROJECT_KEY, repo_name):
-            github_client.add_label_to_issue(github_org, repo_name, issue_number, [IMPORTED_LABEL])
+        is_demand, is_imported = _classify(issue)
+        if not is_demand or is_imported:
             skipped_imports += 1
             continue
 
-        template_fields = parse_github_issue_body(issue.get("body", ""))
-
+        template_fields = parse_github_issue_body(body)
         if not template_fields:
             skipped_imports += 1
             continue
 
+        candidates.append((issue, template_fields))
+
+    existing_numbers = clients.jira_client.check_issues_exist_bulk(
+        PROJECT_KEY, repo_name, [issue.get("number") for issue, _ in candidates]
+    ) if candidates else set()
+
+    for issue, template_fields in candidates:
+        issue_number = issue.get("number")
+
+        if issue_number in existing_numbers:
+            clients.github_client.add_label_to_issue(github_org, repo_name, issue_number, [IMPORTED_LABEL])
+            skipped_imports += 1
+            continue
+
         issue_data = {
             "fields": {
-                "project": {"key": PROJECT_KEY},
-                "issuetype": {"id": ISSUE_TYPE_ID},
+                **_STATIC_FIELDS,
                 "summary": f"[{repo_name}] {issue.get('title', f'GitHub Issue #{issue_number}')}"
             }
         }
@@ -249,64 +237,132 @@ def import_to_jira(issues, repo_name, repo_component_mapping, github_org):
 
         original_description = convert_github_images_to_jira(original_description)
 
-        additional_info = ""
-        if 'doc_type' in template_fields and template_fields['doc_type']:
-            doc_types_str = ", ".join(template_fields['doc_type'])
-            additional_info += f"\n\n**Documents Requested:**\n{doc_types_str}"
+        parts = [original_description]
+        if template_fields.get('doc_type'):
+            parts.append(f"\n\n**Documents Requested:**\n{', '.join(template_fields['doc_type'])}")
 
-        if 'additional_context' in template_fields and template_fields['additional_context']:
+        if template_fields.get('additional_context'):
             additional_context = convert_github_images_to_jira(template_fields['additional_context'])
-            additional_info += f"\n\n**Additional Context:**\n{additional_context}"
+            parts.append(f"\n\n**Additional Context:**\n{additional_context}")
+
+        parts.append(github_link_text)
 
-        description_with_link = original_description + additional_info + github_link_text
-        issue_data['fields']["description"] = description_with_link[:32767]
+        # Trim the body to the room the sections and link leave, so the link survives truncation
+        tail = "".join(part for part in parts[1:] if part)
+        budget = max(0, JIRA_DESCRIPTION_LIMIT - len(tail))
+        description = "".join([(original_description or "")[:budget], tail])
+        if len(description) > JIRA_DESCRIPTION_LIMIT:
+            description = description[:JIRA_DESCRIPTION_LIMIT]
+        issue_data['fields']["description"] = description
 
         # Affected locations from Gitea - will raise if unavailable
-        affected_locations = get_affected_locations_for_org(github_org)
+        affected_locations = get_affected_locations_for_org(clients.gitea_client, github_org)
         issue_data["fields"][template_field_map["affected_locations"]] = [
             {"value": location} for location in affected_locations
         ]
 
-        issue_data["fields"]["priority"] = {"name": HARDCODED_VALUES["priority"]}
-        issue_data["fields"][template_field_map["estimated_effort"]] = {"id": HARDCODED_VALUES["estimated_effort"]}
-        issue_data["fields"][template_field_map["tier"]] = {"id": HARDCODED_VALUES["tier"]}
-        issue_data["fields"][template_field_map["pays_into"]] = [{"id": HARDCODED_VALUES["pays_into"]}]
-
         issue_data["fields"]["labels"] = ["demand", "github-import", repo_name]
 
-        jira_issue = jira_client.create_issue(issue_data)
+        pending.append((issue_number, issue_data))
 
-        if jira_issue:
-            jira_key = jira_issue["key"]
-            jira_url = f"{env_vars.jira_api_url}/browse/{jira_key}"
-            logger.info("Successfully imported issue #%s -> %s", issue_number, jira_url)
+    created = clients.jira_client.create_issues_bulk([issue_data for _, issue_data in pending]) if pending else []
 
-            # Sync comments from GitHub to Jira
-            comment_count = sync_comments_to_jira(jira_key, github_org, repo_name, issue_number)
-            if comment_count > 0:
-                logger.info("Synced %d comments to %s", comment_count, jira_key)
+    imported = [
+        (issue_number, jira_issue["key"]) for (issue_number, _), jira_issue in zip(pending, created) if jira_issue
+    ]
+    failed_imports += len(pending) - len(imported)
 
-            comment_body = f"This issue has been imported to Jira: {jira_key}"
-            github_client.add_comment_to_issue(github_org, repo_name, issue_number, comment_body)
-            github_client.add_label_to_issue(github_org, repo_name, issue_number, [IMPORTED_LABEL])
+    # Record created issues before any further request, so a failure below cannot cause duplicates on rerun
+    for issue_number, jira_key in imported:
+        import_cache.add(github_org, repo_name, issue_number, jira_key)
 
-            successful_imports += 1
-        else:
-            failed_imports += 1
+    try:
+        comments_by_number = clients.github_client.get_comments_bulk(
+            github_org, repo_name, [issue_number for issue_number, _ in imported])
+    except requests.RequestException as e:
+        # Comments are then fetched per issue by sync_comments_to_jira
+        logger.warning("Bulk comment fetch failed for %s/%s: %s", github_org, repo_name, e)
+        comments_by_number = {}
+
+    for issue_number, jira_key in imported:
+        jira_url = f"{clients.env_vars.jira_api_url}/browse/{jira_key}"
+        logger.info("Successfully imported issue #%s -> %s", issue_number, jira_url)
+
+        # Sync comments from GitHub to Jira
+        comment_count = sync_comments_to_jira(
+            clients, jira_key, github_org, repo_name, issue_number, comments_by_number.get(issue_number))
+        if comment_count > 0:
+            logger.info("Synced %d comments to %s", comment_count, jira_key)
 
-        # Rate limiting delay to prevent GitHub API throttling
-        time.sleep(0.5)
+        comment_body = f"This issue has been imported to Jira: {jira_key}"
+        clients.github_client.add_comment_to_issue(github_org, repo_name, issue_number, comment_body)
+        clients.github_client.add_label_to_issue(github_org, repo_name, issue_number, [IMPORTED_LABEL])
+
+        successful_imports += 1
 
     return successful_imports, failed_imports, skipped_imports
 
 
+def process_repo(clients, github_org, repo_name, repo_component_mapping, import_cache):
+    """Import issues of one repository; returns (imported, failed, skipped) counts."""
+    logger.info("Processing: %s/%s", github_org, repo_name)
+
+    try:
+        issues = clients.github_client.get_issues(github_org, repo_name)
+
+        if not issues:
+            return 0, 0, 0
+
+        successful, failed, skipped = import_to_jira(
+            clients, issues, repo_name, repo_component_mapping, github_org, import_cache
+        )
+
+        return successful, failed, skipped
+
+    except requests.RequestException as e:
+        if "404" in str(e):
+            logger.info("Skipped - repo doesn't exist in org %s: %s", github_org, repo_name)
+        else:
+            logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
+    except Exception as e:
+        logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
+
+    return 0, 0, 0
+
+
+def _build_clients():
+    """Validate the environment and create the database and API clients.
+
+    Called from main() so that importing the module has no side effects.
+    """
+    env_vars = EnvVariables()
+    return SimpleNamespace(
+        env_vars=env_vars,
+        database=Database(env_vars),
+        github_client=GitHubClient(env_vars),
+        jira_client=JiraClient(env_vars),
+        gitea_client=GiteaClient(env_vars),
+    )
+
+
 def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    clients = _build_clients()
+
     logger.info("=" * 80)
     logger.info("GitHub to JIRA Issue Importer for DEMAND")
     logger.info("=" * 80)
 
+    env_vars = clients.env_vars
+    import_cache = ImportCache(
+        env_vars.import_cache_path, clients.database, env_vars.db_csv, env_vars.import_cache_table
+    )
+
     try:
-        repositories, repo_component_mapping = get_repositories_from_db()
+        repositories, repo_component_mapping = get_repositories_from_db(clients)
 
         if not repositories:
             logger.error("No repositories found")
@@ -316,35 +372,18 @@ def main():
         total_failed = 0
         total_skipped = 0
 
-        for github_org in env_vars.github_orgs:
-            logger.info("Processing organization: %s", github_org)
-
-            for repo_name in repositories:
-                logger.info("Processing: %s/%s", github_org, repo_name)
-
-                try:
-                    issues = github_client.get_issues(github_org, repo_name)
-
-                    if not issues:
-                        continue
-
-                    successful, failed, skipped = import_to_jira(
-                        issues, repo_name, repo_component_mapping, github_org
-                    )
-
-                    total_successful += successful
-                    total_failed += failed
-                    total_skipped += skipped
+        with ThreadPoolExecutor(max_workers=REPO_WORKERS) as executor:
+            futures = [
+                executor.submit(process_repo, clients, github_org, repo_name, repo_component_mapping, import_cache)
+                for github_org in env_vars.github_orgs
+                for repo_name in repositories
+            ]
 
-                except requests.RequestException as e:
-                    if "404" in str(e):
-                        logger.info("Skipped - repo doesn't exist in org %s: %s", github_org, repo_name)
-                    else:
-                        logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
-                    continue
-                except Exception as e:
-                    logger.error("Error processing %s/%s: %s", github_org, repo_name, str(e))
-                    continue
+            for future in as_completed(futures):
+                successful, failed, skipped = future.result()
+                total_successful += successful
+                total_failed += failed
+                total_skipped += skipped
 
         logger.info("=" * 80)
         logger.info(
@@ -356,7 +395,9 @@ def main():
         logger.error("Critical error: %s", str(e), exc_info=True)
     finally:
         # Ensure connection pool is properly closed
-        database.close_pool()
+        clients.database.close_pool()
+        import_cache.close()
+        clients.github_client.close()
 
 
 if __name__ == "__main__":